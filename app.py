@@ -1,109 +1,281 @@
-from flask import Flask, render_template, redirect, url_for, session, request, jsonify, flash, send_from_directory, send_file, abort
+from flask import Flask, render_template, redirect, url_for, session, request, jsonify, flash, send_from_directory, send_file, abort, g, stream_template, get_flashed_messages
+from flask import Request
+from flask.json.provider import DefaultJSONProvider
+from flask_compress import Compress
+from markupsafe import escape
 from config import Config
-from models import db, Application
-import json
+import orjson
 import os
+import hashlib
+import mimetypes
 import uuid
+import queue
+import atexit
+import logging
+import logging.handlers
+from types import MappingProxyType
 from datetime import datetime
 from datetime import timedelta
-from functools import wraps
+from functools import lru_cache
+from urllib.parse import quote
+from tempfile import SpooledTemporaryFile
+
+logger = logging.getLogger(__name__)
+
+# === LOGGING ===
+def configure_logging():
+    """Send log records through a queue so handler I/O happens on a background thread"""
+    log_queue = queue.Queue(-1)
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+    listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+
+    root_logger = logging.getLogger()
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    root_logger.setLevel(logging.INFO)
+    # Debug output only for our own code; pymongo is very chatty at DEBUG
+    for name in (__name__, 'models', 'auth', 'storage'):
+        logging.getLogger(name).setLevel(logging.DEBUG if Config.FLASK_ENV == 'development' else logging.INFO)
+
+    listener.start()
+    atexit.register(listener.stop)
+
+configure_logging()
+
+# Imported once logging is set up; models connects to MongoDB (and logs it) at import time
+from models import db, Application
+from scoring_algorithm import calculate_tidescore
+from bson import ObjectId
+from storage import (
+    MAX_FILE_SIZE, MAX_TOTAL_SIZE, UPLOAD_DIR, UPLOAD_DIR_REAL, UPLOAD_SPOOL_SIZE, ALLOWED_UPLOAD_EXTS,
+    resolve_upload_path, decorate_storage, save_upload_async,
+    cleanup_user_files, ensure_cleanup_worker, ensure_upload_directory
+)
+
+# === JSON PROVIDER ===
+class OrjsonProvider(DefaultJSONProvider):
+    """jsonify()/request.get_json() backed by orjson; pretty/custom output falls back to the stdlib"""
+
+    def _options(self):
+        options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        return options
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        # Datetimes are passed through to Flask's default() so they keep the HTTP date format
+        return orjson.dumps(obj, default=self.default, option=self._options()).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=self.default, option=self._options() | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+# === REQUEST CLASS ===
+# Endpoints whose views reject anonymous requests before reading request.form
+_SPOOLED_UPLOAD_ENDPOINTS = frozenset({'submit_application'})
+
+class UploadRequest(Request):
+    """Request whose multipart file parts stay in memory up to UPLOAD_SPOOL_SIZE on upload endpoints"""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        if self.endpoint not in _SPOOLED_UPLOAD_ENDPOINTS:
+            # Anyone can post multipart bodies elsewhere (e.g. /auth/login); keep Werkzeug's 500KB spill
+            return super()._get_file_stream(total_content_length, content_type, filename, content_length)
+        # Werkzeug spills parts over 500KB to a temp file, which stream_upload then reads back;
+        # a within-limit document is held in memory instead (MAX_CONTENT_LENGTH bounds the total)
+        return SpooledTemporaryFile(max_size=UPLOAD_SPOOL_SIZE, mode='rb+')
 
 app = Flask(__name__)
+app.request_class = UploadRequest
+app.json = OrjsonProvider(app)
 app.secret_key = Config.SECRET_KEY
-
-# === FILE STORAGE CONSTANTS ===
-MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB per file
-MAX_TOTAL_SIZE = 30 * 1024 * 1024  # 30MB total per user
+app.permanent_session_lifetime = timedelta(days=7)  # Sessions last 7 days
+app.config['SESSION_REFRESH_EACH_REQUEST'] = False  # Only write the cookie when the session changes
+app.config['USE_X_SENDFILE'] = Config.USE_X_SENDFILE  # send_file() hands the bytes to the web server
+
+# === RESPONSE COMPRESSION ===
+# No proxy sits in front of gunicorn, so HTML/JSON is compressed here; files from send_file are left alone
+app.config['COMPRESS_MIMETYPES'] = ['text/html', 'application/json', 'text/css', 'application/javascript']
+app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+app.config['COMPRESS_MIN_SIZE'] = 500
+# Views answer their own conditional requests; Compress would otherwise 304 a page that just consumed a flash
+app.config['COMPRESS_EVALUATE_CONDITIONAL_REQUEST'] = False
+Compress(app)
+
+# === SERVER-SIDE SESSIONS ===
+if Config.REDIS_URL:
+    import redis
+    from flask_session import Session
+
+    # Cookie only carries a session id; the session data lives in Redis
+    app.config['SESSION_TYPE'] = 'redis'
+    app.config['SESSION_REDIS'] = redis.from_url(Config.REDIS_URL)
+    Session(app)
+
+# === DOCUMENT CONSTANTS ===
+VERIFIABLE_DOCUMENTS = ('employment_proof', 'airtime_proof', 'bank_statement')
+DOCUMENT_CACHE_SECONDS = 3600  # Uploaded filenames are unique, so a document's bytes never change
+
+# Application form fields, in the order the admin detail page lists them
+APPLICANT_FORM_FIELDS = (
+    'full_name', 'email', 'phone', 'dob', 'education_level',
+    'employment_status', 'employer_name', 'monthly_income',
+    'airtime_spend_m1', 'airtime_spend_m2', 'airtime_spend_m3',
+    'bank_name', 'account_number', 'avg_monthly_balance',
+    'electricity_verified', 'dstv_verified', 'internet_verified', 'water_verified', 'rent_verified',
+    'g1_name', 'g1_phone', 'g1_relationship',
+    'g2_name', 'g2_phone', 'g2_relationship',
+)
+# Checkboxes are stored as 'Yes'/'No' rather than their submitted value
+APPLICANT_CHECKBOX_FIELDS = frozenset({
+    'electricity_verified', 'dstv_verified', 'internet_verified', 'water_verified', 'rent_verified'
+})
+
+# Fields each list page reads, so the list queries skip form data and verification details
+ADMIN_LIST_FIELDS = ('user_email', 'created_at', 'score_result')
+PENDING_LIST_FIELDS = ('user_email', 'created_at', 'applicant_data.full_name', 'files_path')
+HISTORY_LIST_FIELDS = ('created_at', 'verification_status', 'verified_by', 'score_result', 'files_path')
+
+# Hard cap on request bodies: three max-size files plus room for the form fields
+app.config['MAX_CONTENT_LENGTH'] = 3 * MAX_FILE_SIZE + 1024 * 1024
 
 # === SECURITY HEADERS ===
+# Appended with extend(); no view sets these, so there's nothing to replace
+_SEC_HEADERS = (
+    ('X-Content-Type-Options', 'nosniff'),
+    ('X-Frame-Options', 'SAMEORIGIN'),
+    ('X-XSS-Protection', '1; mode=block')
+)
+
 @app.after_request
 def add_security_headers(response):
-    response.headers['X-Content-Type-Options'] = 'nosniff'
-    response.headers['X-Frame-Options'] = 'SAMEORIGIN'
-    response.headers['X-XSS-Protection'] = '1; mode=block'
+    if request.endpoint == 'health_check':
+        return response  # Load balancer probe, not rendered by a browser
+    response.headers.extend(_SEC_HEADERS)
     return response
 
 # === TEMPLATE FILTER ===
+FROM_JSON_CACHE_MAX_LEN = 64 * 1024  # Larger blobs are parsed every time to bound cache memory
+
+@lru_cache(maxsize=4096)
+def _parse_json_cached(value):
+    parsed = orjson.loads(value)
+    # Cached results are shared between renders, so hand out a read-only view
+    return MappingProxyType(parsed) if isinstance(parsed, dict) else parsed
+
 @app.template_filter('from_json')
 def from_json_filter(value):
+    """Parse a JSON str/bytes value for templates, returning {} when it isn't valid JSON"""
     try:
-        return json.loads(value)
-    except (TypeError, json.JSONDecodeError):
+        if len(value) > FROM_JSON_CACHE_MAX_LEN:
+            return orjson.loads(value)
+        try:
+            return _parse_json_cached(value)
+        except TypeError:
+            # Unhashable input (e.g. a dict) can't be cached; parse it directly
+            return orjson.loads(value)
+    except (TypeError, ValueError):
         return {}
 
 # === AUTH BLUEPRINT ===
-from auth import auth_bp
+from auth import auth_bp, admin_required
 app.register_blueprint(auth_bp)
 
-# === ADMIN REQUIRED DECORATOR ===
-def admin_required(f):
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        if 'user' not in session:
-            return redirect(url_for('auth.login'))
-        if not session['user'].get('is_admin', False):
-            flash('Access denied. Admin privileges required.', 'error')
-            return redirect(url_for('dashboard'))
-        return f(*args, **kwargs)
-    return decorated_function
-
-# === STORAGE MANAGEMENT FUNCTIONS ===
-def cleanup_user_files(user_id):
-    """Clean up old files when user exceeds storage limit"""
-    try:
-        user = db.get_user_by_id(user_id)
-        if not user or user.get('total_storage_used', 0) <= MAX_TOTAL_SIZE:
-            return True
-            
-        # Get user's files sorted by upload date (oldest first)
-        files = user.get('files', [])
-        files.sort(key=lambda x: x.get('uploaded_at', datetime.min))
-        
-        # Delete oldest files until under limit
-        total_used = user.get('total_storage_used', 0)
-        for file_info in files:
-            if total_used <= MAX_TOTAL_SIZE:
-                break
-                
-            # Delete physical file
-            file_path = os.path.join('uploads', file_info['filename'])
-            if os.path.exists(file_path):
-                os.remove(file_path)
-                print(f"Cleaned up file: {file_info['filename']}")
-                
-            # Update storage count
-            total_used -= file_info['size']
-            db.update_user_storage(user_id, file_info['size'], 'remove')
-            
-            # Remove from user's file list
-            db.db.users.update_one(
-                {"_id": user_id},
-                {"$pull": {"files": {"filename": file_info['filename']}}}
-            )
-            
-        return True
-        
-    except Exception as e:
-        print(f"Error cleaning up user files: {e}")
-        return False
+# === CURRENT USER ===
+@app.before_request
+def load_current_user():
+    """Read the logged-in user from the session once per request"""
+    g.user = session.get('user')
+    g.is_admin = bool(g.user and g.user.get('is_admin', False))
+
+# === UPLOADED FILE RESPONSES ===
+def send_upload(file_path):
+    """Respond with an uploaded file (an absolute path from resolve_upload_path).
+
+    With X_ACCEL_REDIRECT_PREFIX set, nginx streams the file from its internal
+    location and this worker only sends headers. Raises FileNotFoundError if
+    the file is missing.
+    """
+    if Config.X_ACCEL_REDIRECT_PREFIX:
+        if not os.path.isfile(file_path):
+            raise FileNotFoundError(file_path)
+        relative_path = os.path.relpath(file_path, UPLOAD_DIR_REAL)
+        response = app.response_class(mimetype=mimetypes.guess_type(file_path)[0] or 'application/octet-stream')
+        response.headers['X-Accel-Redirect'] = f"{Config.X_ACCEL_REDIRECT_PREFIX.rstrip('/')}/{quote(relative_path)}"
+        response.cache_control.max_age = DOCUMENT_CACHE_SECONDS
+    else:
+        # Conditional GET (ETag/Last-Modified) is on by default; with USE_X_SENDFILE the web server sends the bytes
+        response = send_file(file_path, as_attachment=False, max_age=DOCUMENT_CACHE_SECONDS)
+    # Applicant documents must never be stored by shared caches
+    response.cache_control.public = False
+    response.cache_control.private = True
+    return response
 
 # === SESSION PERSISTENCE ===
+_SESSIONLESS_ENDPOINTS = frozenset({'static', 'serve_manifest', 'health_check'})
+
 @app.before_request
 def make_session_permanent():
-    session.permanent = True
-    app.permanent_session_lifetime = timedelta(days=7)  # Sessions last 7 days
-
-# === UTILITY FUNCTION TO ENSURE UPLOAD DIRECTORY EXISTS ===
-def ensure_upload_directory():
-    """Ensure the uploads directory exists"""
-    upload_dir = 'uploads'
-    if not os.path.exists(upload_dir):
-        os.makedirs(upload_dir)
-        print(f"Created upload directory: {upload_dir}")
-    return upload_dir
-
-# CALL THE FUNCTION WHEN APP STARTS
+    if request.endpoint in _SESSIONLESS_ENDPOINTS:
+        return  # Don't hand out session cookies for probes and static assets
+    # Assigning marks the session modified and re-signs the cookie, so only do it once
+    if not session.permanent:
+        session.permanent = True
+
+# === MAINTENANCE MODE ===
+# Endpoints closed while in maintenance mode: JSON endpoints get a 503, pages redirect home with a notice
+_MAINTENANCE_JSON_ENDPOINTS = MappingProxyType({
+    'submit_application': 'Application submissions are temporarily disabled. Please join our waitlist for launch updates.',
+    'calculate_score': 'Score calculations are temporarily disabled during maintenance.'
+})
+_MAINTENANCE_PAGE_ENDPOINTS = MappingProxyType({
+    'dashboard': 'Application is currently in development mode. Please join our waitlist for updates.',
+    'storage_info': 'Application is currently in development mode. Please join our waitlist for updates.',
+    'new_application': 'Application submissions are temporarily disabled. Join our waitlist for launch updates.',
+    'serve_uploaded_file': 'File access is temporarily disabled during maintenance.',
+    'debug_application': 'Debug access is temporarily disabled.',
+    'my_applications': 'Application history is temporarily unavailable. Please join our waitlist for launch updates.'
+})
+
+@app.before_request
+def enforce_maintenance_mode():
+    if not Config.MAINTENANCE_MODE:
+        return None
+    message = _MAINTENANCE_JSON_ENDPOINTS.get(request.endpoint)
+    if message is not None:
+        return jsonify({'error': True, 'message': message}), 503
+    message = _MAINTENANCE_PAGE_ENDPOINTS.get(request.endpoint)
+    if message is not None:
+        flash(message, 'info')
+        return redirect(url_for('home'))
+    return None
+
+if Config.MAINTENANCE_MODE:
+    @app.route('/auth/register', methods=['GET', 'POST'])
+    def register_redirect():
+        """Redirect registration attempts to maintenance"""
+        flash('New registrations are currently disabled. Please join our waitlist for launch updates.', 'info')
+        return redirect(url_for('home'))
+
+    @app.route('/auth/forgot_password', methods=['GET', 'POST'])
+    def forgot_password_redirect():
+        """Redirect password reset attempts to maintenance"""
+        flash('Password reset is temporarily disabled during maintenance.', 'info')
+        return redirect(url_for('home'))
+
+# Create the uploads directory and start the cleanup worker when the app starts
 ensure_upload_directory()
+ensure_cleanup_worker()
 
 # === ROUTES ===
 @app.route('/manifest.json')
@@ -112,11 +284,15 @@ def serve_manifest():
 
 @app.route('/')
 def home():
-    # Always show maintenance page, even for logged-in users (except admins)
-    if 'user' in session and session['user'].get('is_admin', False):
+    if g.is_admin:
         return redirect(url_for('admin_dashboard'))
-    # Show maintenance page for everyone else
-    return render_template('waitlist.html')
+    # Everyone else sees the waitlist while in maintenance mode
+    if Config.MAINTENANCE_MODE:
+        return render_template('waitlist.html')
+    if g.user is not None:
+        return redirect(url_for('dashboard'))
+    # Render the enhanced login page directly
+    return render_template('index.html')
 
 @app.route('/waitlist')
 def waitlist_page():
@@ -144,7 +320,7 @@ def join_waitlist():
         company = data.get('company', '').strip() if data.get('company') else ''
         user_type = data.get('user_type', 'individual')
         
-        print(f"Waitlist submission received: {email}, {name}, {phone}, {company}, {user_type}")
+        logger.debug("Waitlist submission received: %s, %s, %s, %s, %s", email, name, phone, company, user_type)
         
         # Basic validation
         if not email or '@' not in email:
@@ -163,22 +339,20 @@ def join_waitlist():
         success = db.add_waitlist_subscriber(email, name, phone, company, user_type)
         
         if success:
-            print(f"Successfully added to waitlist: {email}")
+            logger.info("Successfully added to waitlist: %s", email)
             return jsonify({
                 'success': True, 
                 'message': 'Successfully joined the waitlist! You\'ll be among the first to know when we launch.'
             })
         else:
-            print(f"Email already on waitlist: {email}")
+            logger.debug("Email already on waitlist: %s", email)
             return jsonify({
                 'success': False, 
                 'message': 'This email is already on our waitlist. Thank you for your interest!'
             })
             
     except Exception as e:
-        print(f"Error joining waitlist: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error joining waitlist: %s", e)
         return jsonify({
             'success': False, 
             'message': 'An error occurred. Please try again.'
@@ -186,94 +360,325 @@ def join_waitlist():
     
 @app.route('/dashboard')
 def dashboard():
-    """Redirect to maintenance"""
-    flash('Application is currently in development mode. Please join our waitlist for updates.', 'info')
-    return redirect(url_for('waitlist.html'))
+    if g.user is None:
+        return redirect(url_for('auth.login'))
+    
+    # Storage info and the latest scored application come back from one query
+    storage_info, latest_scored = db.get_dashboard_bundle(g.user['id'])
+    
+    # Convert bytes to MB for display and add calculated fields
+    if storage_info:
+        decorate_storage(storage_info)
+    else:
+        # Empty storage at the default limit when none is returned
+        storage_info = decorate_storage({
+            'used': 0,
+            'limit': MAX_TOTAL_SIZE,
+            'available': MAX_TOTAL_SIZE,
+            'file_count': 0
+        })
+    
+    # Score from the user's most recent scored application
+    user_score = latest_scored.get_score_dict() if latest_scored else {"scaled_score": 0}
+    
+    return render_template('dashboard.html', 
+                         user_email=g.user['email'],
+                         storage_info=storage_info,  # This is now a dict with all needed fields
+                         user_score=user_score)
 
 @app.route('/storage-info')
 def storage_info():
-    """Redirect to maintenance"""
-    flash('Application is currently in development mode. Please join our waitlist for updates.', 'info')
-    return redirect(url_for('home'))
+    if g.user is None:
+        return redirect(url_for('auth.login'))
+    
+    storage_info = db.get_user_storage_info(g.user['id'])
+    if not storage_info:
+        flash('Could not retrieve storage information', 'error')
+        return redirect(url_for('dashboard'))
+    
+    # Convert bytes to MB for display
+    decorate_storage(storage_info)
+    
+    return render_template('storage_info.html', storage_info=storage_info)
 
 @app.route('/new_application')
 def new_application():
-    """Redirect to maintenance"""
-    flash('Application submissions are temporarily disabled. Join our waitlist for launch updates.', 'info')
-    return redirect(url_for('home'))
+    if g.user is None:
+        return redirect(url_for('auth.login'))
+    
+    # Check storage before allowing new application
+    storage_info = db.get_user_storage_info(g.user['id'])
+    if storage_info and storage_info['available'] <= 0:
+        flash('You have reached your storage limit (30MB). Please delete some files before uploading new ones.', 'error')
+        return redirect(url_for('storage_info'))
+        
+    return render_template('applications.html')
+
+def _remove_uploads(files_uploaded):
+    """Delete saved upload files that won't be referenced by an application"""
+    for file_info in files_uploaded.values():
+        try:
+            os.remove(os.path.join(UPLOAD_DIR, file_info['filename']))
+        except OSError:
+            pass
 
 @app.route('/submit_application', methods=['POST'])
 def submit_application():
-    """Block application submissions"""
-    return jsonify({
-        'error': True,
-        'message': 'Application submissions are temporarily disabled. Please join our waitlist for launch updates.'
-    }), 503
+    if g.user is None:
+        return jsonify({'error': 'Not authorized'}), 401
+
+    try:
+        form = request.form
+        applicant_data = {
+            key: ('Yes' if form.get(key) else 'No') if key in APPLICANT_CHECKBOX_FIELDS else form.get(key)
+            for key in APPLICANT_FORM_FIELDS
+        }
+
+        files_uploaded = {}
+        total_size = 0
+        upload_errors = []
+        now = datetime.utcnow()  # One timestamp for every file in this submission
+        now_iso = now.isoformat()
+
+        # Validate every file first, then write the accepted ones to disk concurrently
+        pending_saves = []
+        for file_type in VERIFIABLE_DOCUMENTS:
+            if file_type in request.files:
+                file = request.files[file_type]
+                if file and file.filename:
+                    file_extension = os.path.splitext(file.filename)[1][1:].lower()
+                    
+                    if file_extension in ALLOWED_UPLOAD_EXTS:
+                        unique_filename = f"{g.user['id']}_{file_type}_{uuid.uuid4().hex}.{file_extension}"
+                        file_path = os.path.join(UPLOAD_DIR, unique_filename)
+                        # Stream to disk, stopping as soon as the file is over the size limit
+                        future = save_upload_async(file, file_path)
+                        pending_saves.append((file_type, file, unique_filename, file_path, future))
+                    else:
+                        error_msg = f'Invalid file type for {file_type}. Allowed: PDF, PNG, JPG, JPEG, DOC, DOCX'
+                        upload_errors.append(error_msg)
+                        flash(error_msg, 'error')
+
+        # Fetch storage once; files accepted in this request are tracked in total_size
+        storage_info = db.get_user_storage_info(g.user['id'])
+
+        # Results are handled in form order so the quota check stays deterministic
+        for file_type, file, unique_filename, file_path, future in pending_saves:
+            try:
+                saved = future.result()
+                if saved is None:
+                    error_msg = f'{file_type.replace("_", " ").title()} exceeds 5MB limit'
+                    upload_errors.append(error_msg)
+                    flash(error_msg, 'error')
+                    continue
+                file_size, file_sha256 = saved
+
+                # Check user's available storage
+                if storage_info and (storage_info['used'] + total_size + file_size) > MAX_TOTAL_SIZE:
+                    os.remove(file_path)
+                    error_msg = 'Total file storage limit (30MB) exceeded'
+                    upload_errors.append(error_msg)
+                    flash(error_msg, 'error')
+                    continue
+                
+                total_size += file_size
+                
+                files_uploaded[file_type] = {
+                    'filename': unique_filename,
+                    'original_name': file.filename,
+                    'size': file_size,
+                    'sha256': file_sha256,
+                    'uploaded_at': now_iso,
+                    'verified': False,
+                    'verification_notes': '',
+                    'verified_by': '',
+                    'verified_at': ''
+                }
+                
+                logger.debug("Saved file %s at %s", unique_filename, file_path)
+                
+            except Exception as e:
+                error_msg = f'Error uploading {file_type}: {str(e)}'
+                logger.warning("Error saving file %s: %s", file.filename, e)
+                upload_errors.append(error_msg)
+                flash(error_msg, 'error')
+
+        # No storage info means either no users document (dev_login sessions, which have
+        # no quota and keep their files) or a failed read, where the quota can't be enforced
+        if files_uploaded and storage_info is None and db.user_exists(g.user['id']) is not False:
+            _remove_uploads(files_uploaded)
+            files_uploaded = {}
+            error_msg = 'Could not check your file storage, so your files were not saved. Please try again.'
+            upload_errors.append(error_msg)
+            flash(error_msg, 'error')
+
+        # Allocate the application id up front so the file records can reference it
+        app_oid = ObjectId()
+
+        # Count the files against the user's quota and record them in one atomic write
+        if files_uploaded and storage_info is not None:
+            file_records = [
+                {
+                    "filename": file_info['filename'],
+                    "type": file_type,
+                    "size": file_info['size'],
+                    "sha256": file_info['sha256'],
+                    "uploaded_at": now,
+                    "application_id": str(app_oid)
+                }
+                for file_type, file_info in files_uploaded.items()
+            ]
+            if not db.add_user_files(g.user['id'], file_records, max_total=MAX_TOTAL_SIZE):
+                # Another upload used up the space since storage was read
+                _remove_uploads(files_uploaded)
+                files_uploaded = {}
+                error_msg = 'Total file storage limit (30MB) exceeded'
+                upload_errors.append(error_msg)
+                flash(error_msg, 'error')
+
+        # If there were upload errors but we still want to proceed with the application
+        if upload_errors:
+            logger.info("Upload errors occurred: %s", upload_errors)
+            # We'll still proceed with the application but note there were file issues
+
+        # Create the application even if some files failed to upload
+        app_id = db.add_application(
+            g.user['id'],
+            g.user['email'],
+            applicant_data,
+            files_uploaded if files_uploaded else None,
+            app_id=app_oid
+        )
+
+        if not app_id:
+            # Nothing references the saved files now, so release them and their storage
+            if files_uploaded:
+                filenames = [file_info['filename'] for file_info in files_uploaded.values()]
+                db.remove_user_files_bulk({g.user['id']: (filenames, total_size)})
+                _remove_uploads(files_uploaded)
+            return jsonify({'error': 'Failed to create application'}), 500
+
+        session['last_application_id'] = app_id
+        
+        # Clean up if over limit
+        cleanup_user_files(g.user['id'])
+        
+        response_data = {
+            'success': True,
+            'message': 'Application submitted successfully! It will be reviewed by our team.',
+            'application_id': app_id
+        }
+        
+        # Include upload warnings if any
+        if upload_errors:
+            response_data['warnings'] = upload_errors
+            response_data['message'] = 'Application submitted with some file upload issues. Our team will review what was received.'
+        
+        return jsonify(response_data)
+
+    except Exception as e:
+        logger.exception("Error submitting application: %s", e)
+        return jsonify({'error': 'Failed to submit application. Please try again.'}), 500
 
 @app.route('/uploads/<filename>')
 def serve_uploaded_file(filename):
-    """Block file access"""
-    flash('File access is temporarily disabled during maintenance.', 'info')
-    return redirect(url_for('home'))
+    if g.user is None:
+        return redirect(url_for('auth.login'))
+    # Upload names start with the owner's user id; only the owner and admins may read them
+    if not g.is_admin and not filename.startswith(f"{g.user['id']}_"):
+        abort(404)
+    file_path = resolve_upload_path(filename)
+    if file_path is None:
+        abort(404)
+    try:
+        return send_upload(file_path)
+    except FileNotFoundError:
+        abort(404)
 
 @app.route('/debug-application/<app_id>')
+@admin_required
 def debug_application(app_id):
-    """Block debug access"""
-    flash('Debug access is temporarily disabled.', 'info')
-    return redirect(url_for('home'))
+    """Debug route to check application data (admins, development only)"""
+    if Config.FLASK_ENV != 'development':
+        abort(404)
+
+    application = db.get_application_by_id(app_id)
+    if not application:
+        return "Application not found"
+    
+    # Every value is applicant-supplied, so escape it before building the page
+    result = f"<h2>Application {escape(application.id)}</h2>"
+    result += f"<p>User: {escape(application.user_email)}</p>"
+    result += f"<p>Files: {escape(application.files_path)}</p>"
+    result += f"<p>Score Result: {escape(application.score_result)}</p>"
+    
+    if application.files_path:
+        result += "<h3>Uploaded Files:</h3>"
+        for file_type, file_info in application.files_path.items():
+            result += f"<p><strong>{escape(file_type)}:</strong> {escape(file_info.get('filename', 'No filename'))}</p>"
+    
+    return result
 
 @app.route('/calculate_score', methods=['POST'])
 def calculate_score():
-    """Block score calculations"""
-    return jsonify({
-        'error': True, 
-        'message': 'Score calculations are temporarily disabled during maintenance.'
-    }), 503
+    if g.user is None:
+        return jsonify({'error': 'Not authorized'}), 401
+
+    try:
+        # Reject missing or malformed bodies before scoring or touching the database
+        applicant_data = request.get_json(silent=True)
+        if not applicant_data:
+            return jsonify({'error': 'Invalid payload'}), 400
+
+        app_id = session.get('last_application_id')
+        if not app_id:
+            return jsonify({'error': 'No application found to update with score'}), 400
+
+        score_result = calculate_tidescore(applicant_data)
+
+        # The update reports whether the application exists, so no separate lookup is needed
+        if not db.update_application_score(app_id, score_result):
+            return jsonify({'error': 'Application not found'}), 404
+
+        return jsonify(score_result)
+
+    except Exception as e:
+        logger.exception("Error calculating score: %s", e)
+        return jsonify({'error': 'Failed to calculate score'}), 500
 
 @app.route('/my_applications')
 def my_applications():
-    """Redirect to maintenance"""
-    flash('Application history is temporarily unavailable. Please join our waitlist for launch updates.', 'info')
-    return redirect(url_for('home'))
-
-# === AUTH ROUTES - REDIRECT TO MAINTENANCE ===
-@app.route('/auth/login', methods=['GET', 'POST'])
-def login_redirect():
-    """Redirect login attempts to maintenance"""
-    flash('New registrations and logins are currently disabled. Please join our waitlist for launch updates.', 'info')
-    return redirect(url_for('home'))
-
-@app.route('/auth/register', methods=['GET', 'POST']) 
-def register_redirect():
-    """Redirect registration attempts to maintenance"""
-    flash('New registrations are currently disabled. Please join our waitlist for launch updates.', 'info')
-    return redirect(url_for('home'))
-
-@app.route('/auth/forgot_password', methods=['GET', 'POST'])
-def forgot_password_redirect():
-    """Redirect password reset attempts to maintenance"""
-    flash('Password reset is temporarily disabled during maintenance.', 'info')
-    return redirect(url_for('home'))
-
-# === ADMIN ROUTES - STILL ACCESSIBLE ===
+    if g.user is None:
+        return redirect(url_for('auth.login'))
+    
+    applications = db.get_user_applications(g.user['id'], fields=HISTORY_LIST_FIELDS)
+    return render_template('application_history.html', applications=applications)
+
+
+# === ADMIN ROUTES ===
 @app.route('/admin')
 @admin_required
 def admin_dashboard():
-    """Admin dashboard with maintenance notice"""
-    total_applications = db.get_application_count()
-    waitlist_count = len(db.get_waitlist_subscribers())
+    """Admin dashboard"""
+    # Counts, average score, distributions and the recent applications come from a single aggregation
+    stats = db.get_dashboard_stats()
+    waitlist_count = db.get_waitlist_count()
     
     return render_template('admin_dashboard.html',
-                         total_applications=total_applications,
                          waitlist_count=waitlist_count,
-                         maintenance_mode=True)
+                         maintenance_mode=Config.MAINTENANCE_MODE,
+                         **stats)
 
 @app.route('/admin/applications')
 @admin_required
 def admin_applications():
     """Admin applications view"""
-    all_applications = db.get_all_applications(limit=100)
-    return render_template('admin_applications.html', applications=all_applications)
+    all_applications = db.get_all_applications(limit=100, fields=ADMIN_LIST_FIELDS)
+    # The session cookie is saved before a streamed body renders, so take the
+    # flashed messages out of the session now; the template reads them from the request
+    get_flashed_messages()
+    # Stream the table out in chunks instead of building the whole page in memory
+    return stream_template('admin_applications.html', applications=all_applications)
 
 @app.route('/admin/application/<app_id>')
 @admin_required
@@ -290,7 +695,7 @@ def admin_application_detail(app_id):
 @admin_required
 def admin_pending_applications():
     """Admin pending applications view"""
-    pending_apps = db.get_pending_applications()
+    pending_apps = db.get_pending_applications(fields=PENDING_LIST_FIELDS)
     return render_template('admin_pending.html', applications=pending_apps)
 
 @app.route('/admin/verify/<app_id>', methods=['GET'])
@@ -311,26 +716,15 @@ def verify_application(app_id):
     try:
         overall_status = request.form.get('overall_status')
         
-        employment_status = request.form.get('employment_proof_status')
-        if employment_status:
-            db.update_file_verification_status(
-                app_id, 'employment_proof', employment_status, 
-                request.form.get('employment_proof_notes')
-            )
-        
-        airtime_status = request.form.get('airtime_proof_status')
-        if airtime_status:
-            db.update_file_verification_status(
-                app_id, 'airtime_proof', airtime_status,
-                request.form.get('airtime_proof_notes')
-            )
-        
-        bank_status = request.form.get('bank_statement_status')
-        if bank_status:
-            db.update_file_verification_status(
-                app_id, 'bank_statement', bank_status,
-                request.form.get('bank_statement_notes')
-            )
+        form_statuses = {file_type: request.form.get(f'{file_type}_status') for file_type in VERIFIABLE_DOCUMENTS}
+        file_statuses = {
+            file_type: (file_status, request.form.get(f'{file_type}_notes'))
+            for file_type, file_status in form_statuses.items()
+            if file_status
+        }
+        employment_status = form_statuses['employment_proof']
+        airtime_status = form_statuses['airtime_proof']
+        bank_status = form_statuses['bank_statement']
         
         verification_data = {
             'employment_verified': 'Yes' if employment_status == 'Verified' else 'No',
@@ -345,26 +739,25 @@ def verify_application(app_id):
             'g2_relationship': request.form.get('g2_relationship_confirmed', 'No')
         }
 
-        if overall_status == 'Verified':
-            from scoring_algorithm import calculate_tidescore
-            score_result = calculate_tidescore(verification_data)
-            
-            db.update_verification(
-                app_id, 
-                session['user']['email'], 
-                verification_data, 
-                score_result,
-                'Verified'
-            )
+        score_result = calculate_tidescore(verification_data) if overall_status == 'Verified' else None
+        
+        # File statuses, overall status and score are saved in a single write
+        db.update_verification_batch(
+            app_id,
+            g.user['email'],
+            overall_status,
+            file_statuses,
+            verified_data=verification_data,
+            score_result=score_result,
+            notes=request.form.get('verification_notes')
+        )
+        if score_result is not None:
             flash('Application verified and score calculated!', 'success')
         else:
-            db.update_verification_status_only(
-                app_id, overall_status, session['user']['email'],
-                request.form.get('verification_notes')
-            )
             flash('Application status updated!', 'success')
         
     except Exception as e:
+        logger.exception("Error updating verification for %s: %s", app_id, e)
         flash(f'Error updating verification: {str(e)}', 'error')
     
     return redirect(url_for('admin_verify_application', app_id=app_id))
@@ -372,41 +765,83 @@ def verify_application(app_id):
 @app.route('/admin/view_document/<app_id>/<document_type>')
 @admin_required
 def admin_view_document(app_id, document_type):
-    """Admin document viewing"""
     try:
-        application = db.get_application_by_id(app_id)
-        if not application:
-            abort(404)
+        logger.debug("Attempting to serve %s for application %s", document_type, app_id)
         
-        if not application.files_path:
-            abort(404)
-            
-        files_data = application.files_path
+        # Only the files_path sub-document is needed here
+        files_path = db.get_application_files_path(app_id)
+        if files_path is None:
+            logger.debug("Application %s not found", app_id)
+            flash('Application not found', 'error')
+            return redirect(url_for('admin_applications'))
         
-        if document_type not in files_data or not files_data[document_type]:
-            abort(404)
+        if not files_path:
+            logger.debug("No files found for application %s", app_id)
+            flash('No files found for this application', 'error')
+            return redirect(url_for('admin_application_detail', app_id=app_id))
         
-        if isinstance(files_data[document_type], dict) and 'filename' in files_data[document_type]:
-            file_path = files_data[document_type]['filename']
-            absolute_path = os.path.join('uploads', file_path)
-            
-            if not os.path.exists(absolute_path):
-                abort(404)
-                
-            return send_file(absolute_path, as_attachment=False)
+        # Check if the document type exists
+        if document_type not in files_path:
+            logger.debug("Document type %s not found", document_type)
+            flash(f'Document type {document_type} not found', 'error')
+            return redirect(url_for('admin_application_detail', app_id=app_id))
+        
+        file_info = files_path[document_type]
+        
+        # Handle both string and dictionary formats
+        if isinstance(file_info, dict):
+            filename = file_info.get('filename')
         else:
-            abort(404)
+            filename = file_info  # Old format
+        
+        if not filename:
+            logger.debug("Filename missing from file info")
+            flash('File information is incomplete', 'error')
+            return redirect(url_for('admin_application_detail', app_id=app_id))
+        
+        file_path = resolve_upload_path(filename)
+        if file_path is None:
+            logger.warning("Refusing document path outside uploads: %s", filename)
+            flash('File information is invalid', 'error')
+            return redirect(url_for('admin_application_detail', app_id=app_id))
+        logger.debug("Serving file at: %s", file_path)
+        
+        # A missing file raises instead of needing an exists() check first
+        try:
+            return send_upload(file_path)
+        except FileNotFoundError:
+            logger.debug("File not found: %s", file_path)
+            flash(f'File not found: {filename}', 'error')
+            return redirect(url_for('admin_application_detail', app_id=app_id))
         
     except Exception as e:
-        print(f"Error serving document: {e}")
-        abort(500)
+        logger.exception("Error serving document: %s", e)
+        flash(f'Error accessing file: {str(e)}', 'error')
+        return redirect(url_for('admin_application_detail', app_id=app_id))
 
 @app.route('/admin/verification-history/<app_id>')
 @admin_required
 def admin_verification_history(app_id):
     """Admin verification history"""
     history = db.get_verification_history(app_id)
-    return render_template('admin_verification_history.html', history=history, app_id=app_id)
+    # History is append-only and sorted newest first, so the newest entry and the
+    # count identify this version of the page; the viewer is included for the nav bar
+    # and pending flashes because the render shows (and consumes) them
+    latest_id = history[0]['_id'] if history else ''
+    flashes = session.get('_flashes') or ''
+    etag = hashlib.md5(f"{g.user['email']}:{len(history)}:{latest_id}:{flashes}".encode()).hexdigest()
+
+    response = app.response_class()
+    # Weak, so Flask-Compress leaves it as is instead of appending the encoding
+    response.set_etag(etag, weak=True)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True  # Always revalidate, but a 304 skips the render
+    if request.if_none_match.contains_weak(etag):
+        response.status_code = 304
+        return response
+
+    response.set_data(render_template('admin_verification_history.html', history=history, app_id=app_id))
+    return response
 
 @app.route('/admin/waitlist')
 @admin_required
@@ -415,13 +850,43 @@ def admin_waitlist():
     subscribers = db.get_waitlist_subscribers()
     return render_template('admin_waitlist.html', subscribers=subscribers)
 
-@app.route('/static/<path:path>')
-def serve_static(path):
-    return send_from_directory('static', path)
+@app.route('/dev_login', methods=['GET', 'POST'])
+def dev_login():
+    if os.environ.get('FLASK_ENV') != 'development':
+        flash('Development login is disabled in production', 'error')
+        return redirect(url_for('auth.login'))
+    
+    if request.method == 'POST':
+        email = request.form.get('email', '').strip().lower()
+        role = request.form.get('role', 'user')
+        
+        if not email or '@' not in email:
+            flash('Please enter a valid email address', 'error')
+            return render_template('dev_login.html', email=email)
+        
+        session['user'] = {
+            'id': f'dev-user-{uuid.uuid4().hex[:8]}',
+            'email': email,
+            'name': email.split('@')[0],
+            'is_admin': role == 'admin'
+        }
+        
+        flash(f'Development login successful as {email} ({role})', 'success')
+        
+        if role == 'admin':
+            return redirect(url_for('admin_dashboard'))
+        else:
+            return redirect(url_for('dashboard'))
+    
+    return render_template('dev_login.html')
+
+
+_HEALTH_BODY = b'{"app":"TideScore","status":"healthy"}\n'
 
 @app.route('/health')
 def health_check():
-    return jsonify({'status': 'healthy', 'app': 'TideScore'})
+    # Fixed body, no serialization; a fresh Response per call so nothing leaks between requests
+    return app.response_class(_HEALTH_BODY, mimetype='application/json')
 
 if __name__ == '__main__':
     print("Starting Tidescore server...")
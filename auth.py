@@ -1,4 +1,4 @@
-from flask import Blueprint, request, redirect, url_for, session, render_template, flash
+from flask import Blueprint, request, redirect, url_for, session, render_template, flash, g
 from config import Config
 from models import db
 import bcrypt
@@ -9,14 +9,42 @@ import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from pymongo.errors import DuplicateKeyError
+import logging
+from functools import wraps
 
 auth_bp = Blueprint('auth', __name__, url_prefix='/auth')
+logger = logging.getLogger(__name__)
+
+def admin_required(f):
+    """Only let logged-in admins through; relies on g.user set by the app's before_request hook"""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if g.user is None:
+            return redirect(url_for('auth.login'))
+        if not g.is_admin:
+            flash('Access denied. Admin privileges required.', 'error')
+            return redirect(url_for('dashboard'))
+        return f(*args, **kwargs)
+    return decorated_function
+
+try:
+    from gevent import get_hub
+    from gevent.monkey import is_module_patched
+except ImportError:  # Not running under gevent workers
+    get_hub = None
+
+def _run_blocking(func, *args):
+    """Run a CPU-bound C call off the gevent loop when the app runs under gevent workers"""
+    if get_hub is not None and is_module_patched('socket'):
+        # bcrypt never yields, so on the loop it would stall every other request in the worker
+        return get_hub().threadpool.apply(func, args)
+    return func(*args)
 
 # PROPER password hashing for NDPR compliance
 def hash_password(password):
     """Hash password using bcrypt with salt - NDPR compliant"""
     salt = bcrypt.gensalt()
-    return bcrypt.hashpw(password.encode(), salt).decode()
+    return _run_blocking(bcrypt.hashpw, password.encode(), salt).decode()
 
 def verify_password(plain_password, hashed_password):
     """Verify password against bcrypt hash - NDPR compliant"""
@@ -24,9 +52,9 @@ def verify_password(plain_password, hashed_password):
         # Ensure both are bytes
         if isinstance(hashed_password, str):
             hashed_password = hashed_password.encode()
-        return bcrypt.checkpw(plain_password.encode(), hashed_password)
+        return _run_blocking(bcrypt.checkpw, plain_password.encode(), hashed_password)
     except Exception as e:
-        print(f"Password verification error: {e}")
+        logger.warning("Password verification error: %s", e)
         return False
 
 def send_password_reset_email(email, reset_token):
@@ -34,7 +62,7 @@ def send_password_reset_email(email, reset_token):
     # In production, you would integrate with a real email service
     # For now, we'll just log the token
     reset_url = f"https://tidescore.onrender.com/auth/reset-password/{reset_token}"
-    print(f"Password reset for {email}: {reset_url}")
+    logger.info("Password reset for %s: %s", email, reset_url)
     
     # TODO: Implement actual email sending with SMTP or email service
     # For now, we'll flash a message with the token for testing
@@ -44,8 +72,8 @@ def send_password_reset_email(email, reset_token):
 @auth_bp.route('/login', methods=['GET', 'POST'])
 def login():
     # If user is already logged in, redirect to appropriate dashboard
-    if 'user' in session:
-        if session['user'].get('is_admin', False):
+    if g.user is not None:
+        if g.is_admin:
             return redirect(url_for('admin_dashboard'))
         else:
             return redirect(url_for('dashboard'))
@@ -73,7 +101,6 @@ def login():
                 
                 # Hash password with bcrypt (NDPR compliant)
                 password_hash = hash_password(password)
-                print(f"DEBUG: Generated password hash: {password_hash[:30]}...")
                 
                 # Register new user
                 user_id = f"user-{uuid.uuid4().hex[:8]}"
@@ -96,7 +123,7 @@ def login():
                 flash('Email already registered. Please login instead.', 'error')
                 return redirect(url_for('home'))
             except Exception as e:
-                print(f"Registration error: {e}")
+                logger.exception("Registration error: %s", e)
                 flash('Registration failed due to system error. Please try again.', 'error')
                 return redirect(url_for('home'))
         
@@ -132,7 +159,7 @@ def login():
                     return redirect(url_for('dashboard'))
                     
             except Exception as e:
-                print(f"Login error: {e}")
+                logger.exception("Login error: %s", e)
                 flash('Login failed. Please try again.', 'error')
                 return redirect(url_for('home'))
     
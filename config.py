@@ -25,6 +25,27 @@ class Config:
     
     # MongoDB configuration (replaced SQLAlchemy)
     MONGODB_URI = os.environ.get("MONGODB_URI")
+    # Connection pool per worker process; min keeps a few sockets warm between requests
+    MONGODB_MAX_POOL_SIZE = int(os.environ.get("MONGODB_MAX_POOL_SIZE", "50"))
+    MONGODB_MIN_POOL_SIZE = int(os.environ.get("MONGODB_MIN_POOL_SIZE", "2"))
+    
+    # File uploads directory. Pointing this at a tmpfs mount makes uploads and
+    # evictions memory-speed, at the cost of losing files on restart.
+    UPLOAD_DIR = os.environ.get("TIDESCORE_UPLOAD_DIR", "uploads")
+    
+    # Let the front-end server (Apache mod_xsendfile / lighttpd) stream files
+    # via the X-Sendfile header. Only enable when such a server sits in front.
+    USE_X_SENDFILE = os.environ.get("USE_X_SENDFILE", "false").lower() == "true"
+    
+    # nginx alternative: internal location aliased to the uploads directory
+    # (e.g. /internal_uploads/). When set, uploads are served via X-Accel-Redirect.
+    X_ACCEL_REDIRECT_PREFIX = os.environ.get("X_ACCEL_REDIRECT_PREFIX")
+    
+    # Optional Redis for server-side sessions; signed cookie sessions are used when unset
+    REDIS_URL = os.environ.get("REDIS_URL")
+    
+    # Pre-launch maintenance mode: only the waitlist and admin pages are available
+    MAINTENANCE_MODE = os.environ.get("MAINTENANCE_MODE", "true").lower() == "true"
     
     # Validation - Only require essential variables
     @classmethod
@@ -0,0 +1,11 @@
+import os
+
+# Requests spend most of their time waiting on MongoDB, disk or the client, so
+# run each worker as a gevent loop instead of one request per process. The
+# gevent worker monkey-patches the standard library before the app is imported.
+worker_class = "gevent"
+# Each upload can hold up to three 5MB parts in memory, so keep the per-worker
+# connection count to what the instance's memory can cover
+worker_connections = int(os.environ.get("GUNICORN_WORKER_CONNECTIONS", "100"))
+workers = int(os.environ.get("WEB_CONCURRENCY", "2"))
+bind = f"0.0.0.0:{os.environ.get('PORT', '10000')}"
@@ -1,29 +1,38 @@
-from pymongo import MongoClient, ASCENDING, DESCENDING
+from pymongo import MongoClient, ASCENDING, DESCENDING, UpdateOne, ReturnDocument
 from bson import ObjectId
 from datetime import datetime
 import bcrypt
 import os
 from config import Config
-import json
 import time
-from pymongo.errors import DuplicateKeyError
+import heapq
+import threading
+from pymongo.errors import DuplicateKeyError, OperationFailure, BulkWriteError
+import logging
+
+logger = logging.getLogger(__name__)
 
 def _connect_with_retry(uri, max_retries=3, base_delay=2):
     """Attempt to connect to MongoDB with retries and a ping health check."""
     if not uri:
-        print("❌ MONGODB_URI is not set. Please set the MONGODB_URI environment variable.")
+        logger.error("MONGODB_URI is not set. Please set the MONGODB_URI environment variable.")
         return None, None
 
     from urllib.parse import urlparse
     last_exc = None
     for attempt in range(1, max_retries + 1):
         try:
-            print(f"Attempting to connect to MongoDB (attempt {attempt})...")
-            client = MongoClient(uri, serverSelectionTimeoutMS=10000)
+            logger.info("Attempting to connect to MongoDB (attempt %s)...", attempt)
+            client = MongoClient(
+                uri,
+                serverSelectionTimeoutMS=10000,
+                maxPoolSize=Config.MONGODB_MAX_POOL_SIZE,
+                minPoolSize=Config.MONGODB_MIN_POOL_SIZE
+            )
 
             # Use a lightweight ping to validate connectivity/auth
             client.admin.command('ping')
-            print("✅ Successfully connected to MongoDB!")
+            logger.info("Successfully connected to MongoDB!")
 
             # Parse DB name from URI path (if present)
             parsed_uri = urlparse(uri)
@@ -31,38 +40,82 @@ def _connect_with_retry(uri, max_retries=3, base_delay=2):
             db_name = db_name.split('?')[0] if db_name else ''
             if not db_name:
                 db_name = 'tidescore'
-                print("No database name found in URI; defaulting to 'tidescore'")
+                logger.info("No database name found in URI; defaulting to 'tidescore'")
 
             db = client[db_name]
-            print(f"Using database: {db_name}")
+            logger.info("Using database: %s", db_name)
             return client, db
 
         except Exception as e:
             last_exc = e
-            print(f"❌ MongoDB connection attempt {attempt} failed: {e}")
+            logger.error("MongoDB connection attempt %s failed: %s", attempt, e)
             if attempt < max_retries:
                 delay = base_delay * (2 ** (attempt - 1))
-                print(f"Retrying in {delay}s...")
+                logger.warning("Retrying in %ss...", delay)
                 time.sleep(delay)
 
-    print("❌ All MongoDB connection attempts failed.")
-    print("Possible causes: wrong URI, network restrictions, paused cluster, or bad credentials.")
-    print("Tips: verify MONGODB_URI, allow your IP in Atlas Network Access, and ensure the user has proper DB privileges.")
-    print(f"Last error: {last_exc}")
+    logger.error("All MongoDB connection attempts failed.")
+    logger.error("Possible causes: wrong URI, network restrictions, paused cluster, or bad credentials.")
+    logger.error("Tips: verify MONGODB_URI, allow your IP in Atlas Network Access, and ensure the user has proper DB privileges.")
+    logger.error("Last error: %s", last_exc)
     return None, None
 
+class _TTLCache:
+    """Small thread-safe in-process cache whose entries expire after ttl seconds"""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            if key not in self._data and len(self._data) >= self.maxsize:
+                # Drop the oldest insertion to stay within maxsize
+                self._data.pop(next(iter(self._data)))
+            self._data[key] = (value, time.monotonic() + self.ttl)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+def _upload_key(file_info, _missing=datetime.min):
+    """Sort key for user file records: upload time, oldest first (missing sorts first)"""
+    return file_info.get('uploaded_at', _missing)
+
 # MongoDB connection
 client, mongo_db = _connect_with_retry(Config.MONGODB_URI, max_retries=3, base_delay=2)
 
 class Database:
     def __init__(self):
         self.db = mongo_db
+        # Admins reload detail/document pages repeatedly while verifying
+        self._application_cache = _TTLCache(maxsize=512, ttl=30)
+        # Admin dashboard counters; cleared whenever an application is added, verified or scored
+        # (the waitlist count is dropped when someone joins the waitlist)
+        self._dashboard_stats_cache = _TTLCache(maxsize=2, ttl=30)
         self.init_db()
     
     def init_db(self):
         """Initialize database collections and indexes"""
         if self.db is None:
-            print("Database connection is None, skipping initialization")
+            logger.error("Database connection is None, skipping initialization")
             return
             
         try:
@@ -71,17 +124,25 @@ class Database:
             
             for collection_name in collections_to_create:
                 if collection_name not in self.db.list_collection_names():
-                    print(f"Creating collection: {collection_name}")
+                    logger.info("Creating collection: %s", collection_name)
                     self.db[collection_name].insert_one({'_init': True, 'created_at': datetime.utcnow()})
                     self.db[collection_name].delete_one({'_init': True})
             
             # Create indexes
             self.db.users.create_index([("email", ASCENDING)], unique=True)
-            self.db.applications.create_index([("user_id", ASCENDING)])
+            # Over-quota lookups by the storage cleanup sweeper
+            self.db.users.create_index([("total_storage_used", ASCENDING)])
+            # Compound indexes match the filter + created_at sort used by the list queries
+            self.db.applications.create_index([("user_id", ASCENDING), ("created_at", DESCENDING)])
             self.db.applications.create_index([("user_email", ASCENDING)])
-            self.db.applications.create_index([("verification_status", ASCENDING)])
-            self.db.verification_history.create_index([("application_id", ASCENDING)])
+            self.db.applications.create_index([("verification_status", ASCENDING), ("created_at", DESCENDING)])
+            # Newest-first admin list (get_all_applications)
+            self.db.applications.create_index([("created_at", DESCENDING)])
+            # History is read per application, newest first
+            self.db.verification_history.create_index([("application_id", ASCENDING), ("created_at", DESCENDING)])
             self.db.waitlist.create_index([("email", ASCENDING)], unique=True)
+            # Active-subscriber list (newest first) and count
+            self.db.waitlist.create_index([("status", ASCENDING), ("subscribed_at", DESCENDING)])
             
             # Ensure admin user exists
             admin_email = "admin@tidescore.com"
@@ -109,47 +170,105 @@ class Database:
                 )
 
                 if result.upserted_id:
-                    print("Admin user created successfully (upsert)")
+                    logger.info("Admin user created successfully (upsert)")
                 else:
-                    print("Admin user already exists (no-op)")
+                    logger.info("Admin user already exists (no-op)")
             except Exception as e:
-                print(f"Error ensuring admin user exists: {e}")
+                logger.error("Error ensuring admin user exists: %s", e)
                 
             # Initialize storage fields for existing users
             self.initialize_storage_fields()
                 
         except Exception as e:
-            print(f"Error during database initialization: {e}")
+            logger.error("Error during database initialization: %s", e)
 
     # ===== STORAGE MANAGEMENT METHODS =====
     def get_user_storage_info(self, user_id):
         """Get storage information for a specific user"""
         if self.db is None:
-            print("Database connection is None, cannot get storage info")
+            logger.error("Database connection is None, cannot get storage info")
             return None
             
         try:
-            user = self.db.users.find_one({"_id": user_id})
+            user = self.get_user_storage_snapshot(user_id)
             if not user:
                 return None
             
-            used = user.get('total_storage_used', 0)
-            limit = 30 * 1024 * 1024  # 30MB limit
-            
-            return {
-                'used': used,
-                'limit': limit,
-                'available': max(0, limit - used),
-                'file_count': len(user.get('files', []))
-            }
+            return self._build_storage_info(user.get('total_storage_used', 0), len(user.get('files', [])))
+        except Exception as e:
+            logger.error("Error getting user storage info: %s", e)
+            return None
+
+    @staticmethod
+    def _build_storage_info(used, file_count):
+        """Shape raw storage numbers into the storage_info dict used by the views"""
+        limit = 30 * 1024 * 1024  # 30MB limit
+        return {
+            'used': used,
+            'limit': limit,
+            'available': max(0, limit - used),
+            'file_count': file_count
+        }
+
+    def get_dashboard_bundle(self, user_id):
+        """Get (storage_info, latest scored Application) for the dashboard in one round trip"""
+        if self.db is None:
+            logger.error("Database connection is None, cannot get dashboard data")
+            return None, None
+
+        try:
+            pipeline = [
+                {"$match": {"_id": user_id}},
+                {"$project": {
+                    "total_storage_used": 1,
+                    "file_count": {"$size": {"$ifNull": ["$files", []]}}
+                }},
+                {"$lookup": {
+                    "from": "applications",
+                    "localField": "_id",
+                    "foreignField": "user_id",
+                    "pipeline": [
+                        {"$match": {"score_result.scaled_score": {"$gt": 0}}},
+                        {"$sort": {"created_at": -1}},
+                        {"$limit": 1}
+                    ],
+                    "as": "latest_scored"
+                }}
+            ]
+            user = next(self.db.users.aggregate(pipeline), None)
+        except OperationFailure:
+            # $lookup with both localField and pipeline needs MongoDB 5.0+
+            return self.get_user_storage_info(user_id), self.get_latest_scored_application(user_id)
+        except Exception as e:
+            logger.error("Error getting dashboard data: %s", e)
+            return None, None
+
+        if not user:
+            # No users document (e.g. dev_login sessions) can still have applications
+            return None, self.get_latest_scored_application(user_id)
+        storage_info = self._build_storage_info(user.get('total_storage_used', 0), user.get('file_count', 0))
+        latest = user.get('latest_scored')
+        return storage_info, (Application.from_dict(latest[0]) if latest else None)
+
+    def get_user_storage_snapshot(self, user_id):
+        """Get only the storage fields (files, total_storage_used) of a user"""
+        if self.db is None:
+            logger.error("Database connection is None, cannot get storage snapshot")
+            return None
+
+        try:
+            return self.db.users.find_one(
+                {"_id": user_id},
+                {"files": 1, "total_storage_used": 1}
+            )
         except Exception as e:
-            print(f"Error getting user storage info: {e}")
+            logger.error("Error getting user storage snapshot: %s", e)
             return None
 
     def update_user_storage(self, user_id, size, operation='add'):
         """Update user's storage usage"""
         if self.db is None:
-            print("Database connection is None, cannot update storage")
+            logger.error("Database connection is None, cannot update storage")
             return False
             
         try:
@@ -161,38 +280,213 @@ class Database:
             result = self.db.users.update_one({"_id": user_id}, update_op)
             return result.modified_count > 0
         except Exception as e:
-            print(f"Error updating user storage: {e}")
+            logger.error("Error updating user storage: %s", e)
+            return False
+
+    def add_user_files(self, user_id, file_records, max_total=None):
+        """Append file records to a user's file list and count their size, in one write.
+
+        With max_total set, nothing is written (and False is returned) if the
+        user's storage would end up over it.
+        """
+        if self.db is None:
+            logger.error("Database connection is None, cannot add user files")
+            return False
+
+        if not file_records:
+            return True
+
+        try:
+            file_records = list(file_records)
+            total_size = sum(record['size'] for record in file_records)
+            query = {"_id": user_id}
+            if max_total is not None:
+                # Quota check and increment in one atomic update, so concurrent uploads can't both pass
+                query["total_storage_used"] = {"$lte": max_total - total_size}
+            result = self.db.users.update_one(
+                query,
+                {
+                    "$inc": {"total_storage_used": total_size},
+                    "$push": {"files": {"$each": file_records}}
+                }
+            )
+            return result.modified_count > 0
+        except Exception as e:
+            logger.error("Error adding user files: %s", e)
             return False
 
+    def remove_user_files_bulk(self, evictions):
+        """Remove files for several users in one bulk write.
+
+        evictions maps user_id -> (filenames, total_size). Returns the user IDs
+        whose evicted files are no longer listed, i.e. whose files are safe to
+        delete from disk.
+        """
+        if self.db is None:
+            logger.error("Database connection is None, cannot remove user files")
+            return []
+
+        user_ids = [user_id for user_id, (filenames, _) in evictions.items() if filenames]
+        if not user_ids:
+            return []
+
+        # Only match while every victim is still listed, so two processes evicting
+        # the same files can't release their storage twice
+        ops = [
+            UpdateOne(
+                {"_id": user_id, "files.filename": {"$all": list(evictions[user_id][0])}},
+                {
+                    "$pull": {"files": {"filename": {"$in": list(evictions[user_id][0])}}},
+                    "$inc": {"total_storage_used": -evictions[user_id][1]}
+                }
+            )
+            for user_id in user_ids
+        ]
+
+        try:
+            try:
+                matched = self.db.users.bulk_write(ops, ordered=False).matched_count
+                applied = user_ids
+            except BulkWriteError as e:
+                failed = {error['index'] for error in e.details.get('writeErrors', [])}
+                logger.error("Error removing files for %s users: %s", len(failed), e)
+                matched = e.details.get('nMatched', 0)
+                applied = [user_id for index, user_id in enumerate(user_ids) if index not in failed]
+
+            if matched >= len(applied):
+                return applied
+
+            # Some filters matched nothing because another process changed those file
+            # lists first; files it left listed are still referenced and must stay on disk
+            still_listed = {
+                user['_id'] for user in self.db.users.find(
+                    {"$or": [
+                        {"_id": user_id, "files.filename": {"$in": list(evictions[user_id][0])}}
+                        for user_id in applied
+                    ]},
+                    {"_id": 1}
+                )
+            } if applied else set()
+            return [user_id for user_id in applied if user_id not in still_listed]
+        except Exception as e:
+            logger.error("Error removing user files: %s", e)
+            return []
+
+    def get_over_quota_user_ids(self, user_ids, max_total):
+        """Get which users are using more than max_total bytes (all users if user_ids is None)"""
+        if self.db is None:
+            logger.error("Database connection is None, cannot check storage quotas")
+            return []
+
+        try:
+            query = {"total_storage_used": {"$gt": max_total}}
+            if user_ids is not None:
+                query["_id"] = {"$in": list(user_ids)}
+            users = self.db.users.find(query, {"_id": 1})
+            return [user["_id"] for user in users]
+        except Exception as e:
+            logger.error("Error checking storage quotas: %s", e)
+            return []
+
+    def compute_eviction_set(self, user_id, max_total):
+        """Get the oldest files (filename and size) to delete to bring a user under max_total"""
+        if self.db is None:
+            logger.error("Database connection is None, cannot compute eviction set")
+            return []
+
+        try:
+            pipeline = [
+                {"$match": {"_id": user_id, "total_storage_used": {"$gt": max_total}}},
+                {"$unwind": "$files"},
+                {"$setWindowFields": {
+                    "sortBy": {"files.uploaded_at": 1},
+                    "output": {"cum_size": {
+                        "$sum": "$files.size",
+                        "window": {"documents": ["unbounded", "current"]}
+                    }}
+                }},
+                # A file is evicted while the space used by older files is still below the overage
+                {"$match": {"$expr": {"$lt": [
+                    {"$subtract": ["$cum_size", "$files.size"]},
+                    {"$subtract": ["$total_storage_used", max_total]}
+                ]}}},
+                {"$project": {"_id": 0, "filename": "$files.filename", "size": "$files.size"}}
+            ]
+            return list(self.db.users.aggregate(pipeline))
+        except OperationFailure as e:
+            # $setWindowFields needs MongoDB 5.0+; compute the same set client-side on older servers
+            logger.warning("Eviction aggregation unavailable, falling back to client-side: %s", e)
+            return self._compute_eviction_set_client_side(user_id, max_total)
+        except Exception as e:
+            logger.error("Error computing eviction set: %s", e)
+            return []
+
+    def _compute_eviction_set_client_side(self, user_id, max_total):
+        """Client-side equivalent of compute_eviction_set"""
+        user = self.get_user_storage_snapshot(user_id)
+        if not user or user.get('total_storage_used', 0) <= max_total:
+            return []
+
+        files = user.get('files', [])
+        overage = user.get('total_storage_used', 0) - max_total
+
+        # Only the oldest few files are ever evicted, so partially order them and
+        # widen the window if it turns out not to free enough space
+        k = max(16, len(files) // 4)
+        while True:
+            oldest = heapq.nsmallest(k, files, key=_upload_key)
+            victims = []
+            freed = 0
+            for file_info in oldest:
+                if freed >= overage:
+                    break
+                victims.append({"filename": file_info['filename'], "size": file_info['size']})
+                freed += file_info['size']
+            if freed >= overage or k >= len(files):
+                return victims
+            k *= 2
+
     def get_user_by_id(self, user_id):
         """Get user by ID"""
         if self.db is None:
-            print("Database connection is None, cannot get user by ID")
+            logger.error("Database connection is None, cannot get user by ID")
             return None
             
         try:
             return self.db.users.find_one({"_id": user_id})
         except Exception as e:
-            print(f"Error getting user by ID: {e}")
+            logger.error("Error getting user by ID: %s", e)
+            return None
+
+    def user_exists(self, user_id):
+        """Whether a users document exists for user_id (None if the lookup failed)"""
+        if self.db is None:
+            logger.error("Database connection is None, cannot check user")
+            return None
+
+        try:
+            return self.db.users.count_documents({"_id": user_id}, limit=1) > 0
+        except Exception as e:
+            logger.error("Error checking user %s: %s", user_id, e)
             return None
 
     def get_user_files(self, user_id):
         """Get all files for a user"""
         if self.db is None:
-            print("Database connection is None, cannot get user files")
+            logger.error("Database connection is None, cannot get user files")
             return []
             
         try:
             user = self.db.users.find_one({"_id": user_id})
             return user.get('files', []) if user else []
         except Exception as e:
-            print(f"Error getting user files: {e}")
+            logger.error("Error getting user files: %s", e)
             return []
 
     def initialize_storage_fields(self):
         """Initialize storage fields for existing users who don't have them"""
         if self.db is None:
-            print("Database connection is None, cannot initialize storage fields")
+            logger.error("Database connection is None, cannot initialize storage fields")
             return False
             
         try:
@@ -208,17 +502,17 @@ class Database:
                 {"$set": {"files": []}}
             )
             
-            print(f"Initialized storage fields for {result1.modified_count + result2.modified_count} users")
+            logger.info("Initialized storage fields for %s users", result1.modified_count + result2.modified_count)
             return True
         except Exception as e:
-            print(f"Error initializing storage fields: {e}")
+            logger.error("Error initializing storage fields: %s", e)
             return False
 
     # ===== WAITLIST METHODS =====
     def add_waitlist_subscriber(self, email, name=None, phone=None, company=None, user_type='individual'):
         """Add a new subscriber to the waitlist"""
         if self.db is None:
-            print("Database connection is None, cannot add waitlist subscriber")
+            logger.error("Database connection is None, cannot add waitlist subscriber")
             return False
             
         try:
@@ -238,30 +532,49 @@ class Database:
                 return False
                 
             result = self.db.waitlist.insert_one(subscriber_data)
+            self._dashboard_stats_cache.delete('waitlist_count')
             return result.inserted_id is not None
             
         except Exception as e:
-            print(f"Error adding waitlist subscriber: {e}")
+            logger.error("Error adding waitlist subscriber: %s", e)
             return False
 
     def get_waitlist_subscribers(self):
         """Get all waitlist subscribers"""
         if self.db is None:
-            print("Database connection is None, cannot get waitlist subscribers")
+            logger.error("Database connection is None, cannot get waitlist subscribers")
             return []
             
         try:
             subscribers = self.db.waitlist.find({"status": "active"}).sort("subscribed_at", DESCENDING)
             return list(subscribers)
         except Exception as e:
-            print(f"Error getting waitlist subscribers: {e}")
+            logger.error("Error getting waitlist subscribers: %s", e)
             return []
 
+    def get_waitlist_count(self):
+        """Get the number of active waitlist subscribers"""
+        if self.db is None:
+            logger.error("Database connection is None, cannot count waitlist subscribers")
+            return 0
+            
+        cached = self._dashboard_stats_cache.get('waitlist_count')
+        if cached is not None:
+            return cached
+            
+        try:
+            count = self.db.waitlist.count_documents({"status": "active"})
+            self._dashboard_stats_cache.set('waitlist_count', count)
+            return count
+        except Exception as e:
+            logger.error("Error counting waitlist subscribers: %s", e)
+            return 0
+
     # ===== USER METHODS =====
     def add_user(self, user_id, email, password_hash, is_admin=False):
         """Add a new user to the database"""
         if self.db is None:
-            print("Database connection is None, cannot add user")
+            logger.error("Database connection is None, cannot add user")
             return False
             
         try:
@@ -277,55 +590,54 @@ class Database:
                 "total_storage_used": 0,
                 "files": []
             }
-            print(f"DEBUG: Attempting to insert user: { {k: v for k, v in user_data.items() if k != 'password_hash'} }")
+            logger.debug("Attempting to insert user: %s", {k: v for k, v in user_data.items() if k != 'password_hash'})
             
             result = self.db.users.insert_one(user_data)
             
             if result.inserted_id:
-                print(f"DEBUG: User inserted successfully with ID: {result.inserted_id}")
+                logger.debug("User inserted successfully with ID: %s", result.inserted_id)
                 # Verify the user was actually stored
                 verify_user = self.db.users.find_one({"_id": user_id})
                 if verify_user:
-                    print(f"DEBUG: Verification - User found in DB: {verify_user['_id']}")
+                    logger.debug("Verification - User found in DB: %s", verify_user['_id'])
                 else:
-                    print("DEBUG: Verification FAILED - User not found after insertion!")
+                    logger.debug("Verification FAILED - User not found after insertion!")
                 return True
             else:
-                print("DEBUG: User insertion failed - no inserted_id returned")
+                logger.debug("User insertion failed - no inserted_id returned")
                 return False
                 
         except DuplicateKeyError:
-            print(f"User with email {email} already exists")
+            logger.warning("User with email %s already exists", email)
             return False
         except Exception as e:
-            print(f"Error adding user: {e}")
+            logger.error("Error adding user: %s", e)
             return False
     
     def get_user_by_email(self, email):
         """Get user by email address"""
         if self.db is None:
-            print("Database connection is None, cannot get user")
+            logger.error("Database connection is None, cannot get user")
             return None
             
         try:
-            print(f"DEBUG: Searching for user with email: {email}")
+            logger.debug("Searching for user with email: %s", email)
             user = self.db.users.find_one({"email": email})
             if user:
-                print(f"DEBUG: User found: {user['_id']}")
-                print(f"DEBUG: User data: { {k: v for k, v in user.items() if k != 'password_hash'} }")
+                logger.debug("User found: %s", user['_id'])
+                logger.debug("User data: %s", {k: v for k, v in user.items() if k != 'password_hash'})
             else:
-                print("DEBUG: No user found with this email")
+                logger.debug("No user found with this email")
             return user
         except Exception as e:
-            print(f"Error getting user: {e}")
+            logger.error("Error getting user: %s", e)
             return None
 
     def verify_user_password(self, email, password):
         """Verify user password using bcrypt"""
         user = self.get_user_by_email(email)
         if user:
-            print(f"DEBUG: Verifying password for user: {user['_id']}")
-            print(f"DEBUG: Stored hash: {user['password_hash'][:20]}...")
+            logger.debug("Verifying password for user: %s", user['_id'])
             
             # Check if password_hash is a string or bytes
             if isinstance(user['password_hash'], bytes):
@@ -334,15 +646,15 @@ class Database:
                 stored_hash = user['password_hash'].encode()
                 
             result = bcrypt.checkpw(password.encode(), stored_hash)
-            print(f"DEBUG: Password verification result: {result}")
+            logger.debug("Password verification result: %s", result)
             return result
-        print("DEBUG: No user found for password verification")
+        logger.debug("No user found for password verification")
         return False
 
     def update_last_login(self, user_id):
         """Update user's last login timestamp"""
         if self.db is None:
-            print("Database connection is None, cannot update last login")
+            logger.error("Database connection is None, cannot update last login")
             return False
             
         try:
@@ -352,14 +664,14 @@ class Database:
             )
             return True
         except Exception as e:
-            print(f"Error updating last login: {e}")
+            logger.error("Error updating last login: %s", e)
             return False
 
     # ===== PASSWORD RESET METHODS =====
     def set_password_reset_token(self, email, token, expiry):
         """Set password reset token for a user"""
         if self.db is None:
-            print("Database connection is None, cannot set reset token")
+            logger.error("Database connection is None, cannot set reset token")
             return False
             
         try:
@@ -372,13 +684,13 @@ class Database:
             )
             return True
         except Exception as e:
-            print(f"Error setting reset token: {e}")
+            logger.error("Error setting reset token: %s", e)
             return False
     
     def get_user_by_reset_token(self, token):
         """Get user by reset token"""
         if self.db is None:
-            print("Database connection is None, cannot get user by token")
+            logger.error("Database connection is None, cannot get user by token")
             return None
             
         try:
@@ -387,13 +699,13 @@ class Database:
                 "reset_token_expiry": {"$gt": datetime.utcnow()}
             })
         except Exception as e:
-            print(f"Error getting user by token: {e}")
+            logger.error("Error getting user by token: %s", e)
             return None
     
     def update_user_password(self, user_id, new_password_hash):
         """Update user password and clear reset token"""
         if self.db is None:
-            print("Database connection is None, cannot update password")
+            logger.error("Database connection is None, cannot update password")
             return False
             
         try:
@@ -407,14 +719,14 @@ class Database:
             )
             return True
         except Exception as e:
-            print(f"Error updating password: {e}")
+            logger.error("Error updating password: %s", e)
             return False
 
     # ===== APPLICATION METHODS =====
-    def add_application(self, user_id, user_email, applicant_data, files_path=None):
-        """Add a new application submission"""
+    def add_application(self, user_id, user_email, applicant_data, files_path=None, app_id=None):
+        """Add a new application submission, optionally with a pre-allocated ObjectId"""
         if self.db is None:
-            print("Database connection is None, cannot add application")
+            logger.error("Database connection is None, cannot add application")
             return None
             
         try:
@@ -431,94 +743,47 @@ class Database:
                 "admin_verified_data": None,
                 "score_result": None
             }
+            if app_id is not None:
+                application_data["_id"] = app_id
             result = self.db.applications.insert_one(application_data)
+            self._dashboard_stats_cache.clear()
             return str(result.inserted_id)
         except Exception as e:
-            print(f"Error adding application: {e}")
+            logger.error("Error adding application: %s", e)
             return None
     
-    def get_pending_applications(self):
-        """Get all applications pending verification"""
+    def get_pending_applications(self, fields=None):
+        """Get all applications pending verification (only the given fields, if any)"""
         if self.db is None:
-            print("Database connection is None, cannot get pending applications")
+            logger.error("Database connection is None, cannot get pending applications")
             return []
             
         try:
             applications = self.db.applications.find(
-                {"verification_status": "Pending"}
+                {"verification_status": "Pending"}, fields
             ).sort("created_at", DESCENDING)
-            return [Application.from_dict(app) for app in applications]
+            return Application.from_dicts(applications)
         except Exception as e:
-            print(f"Error getting pending applications: {e}")
+            logger.error("Error getting pending applications: %s", e)
             return []
     
     def get_application_for_verification(self, app_id):
         """Get application details for verification"""
         if self.db is None:
-            print("Database connection is None, cannot get application for verification")
+            logger.error("Database connection is None, cannot get application for verification")
             return None
             
         try:
             application = self.db.applications.find_one({"_id": ObjectId(app_id)})
             return Application.from_dict(application) if application else None
         except Exception as e:
-            print(f"Error getting application for verification: {e}")
+            logger.error("Error getting application for verification: %s", e)
             return None
     
-    def update_verification(self, app_id, admin_email, verified_data, score_result, status='Verified'):
-        """Update application verification status and scores"""
-        if self.db is None:
-            print("Database connection is None, cannot update verification")
-            return False
-            
-        try:
-            self.db.applications.update_one(
-                {"_id": ObjectId(app_id)},
-                {"$set": {
-                    "verification_status": status,
-                    "admin_verified_data": verified_data,
-                    "score_result": score_result,
-                    "verified_at": datetime.utcnow(),
-                    "verified_by": admin_email
-                }}
-            )
-            return True
-        except Exception as e:
-            print(f"Error updating verification: {e}")
-            return False
-    
-    def update_verification_status_only(self, app_id, status, admin_email, notes=None):
-        """Update only the verification status without score data"""
-        if self.db is None:
-            print("Database connection is None, cannot update verification status")
-            return False
-            
-        try:
-            self.db.applications.update_one(
-                {"_id": ObjectId(app_id)},
-                {"$set": {
-                    "verification_status": status,
-                    "verified_at": datetime.utcnow(),
-                    "verified_by": admin_email
-                }}
-            )
-            
-            # Add to verification history
-            self.add_verification_history(
-                app_id,
-                admin_email,
-                f'Status changed to {status}',
-                notes=notes
-            )
-            return True
-        except Exception as e:
-            print(f"Error updating verification status: {e}")
-            return False
-    
     def add_verification_history(self, app_id, admin_email, action, field_name=None, old_value=None, new_value=None, notes=None):
         """Add entry to verification history"""
         if self.db is None:
-            print("Database connection is None, cannot add verification history")
+            logger.error("Database connection is None, cannot add verification history")
             return False
             
         try:
@@ -535,13 +800,13 @@ class Database:
             self.db.verification_history.insert_one(history_data)
             return True
         except Exception as e:
-            print(f"Error adding verification history: {e}")
+            logger.error("Error adding verification history: %s", e)
             return False
     
     def get_verification_history(self, app_id):
         """Get verification history for an application"""
         if self.db is None:
-            print("Database connection is None, cannot get verification history")
+            logger.error("Database connection is None, cannot get verification history")
             return []
             
         try:
@@ -550,107 +815,188 @@ class Database:
             ).sort("created_at", DESCENDING)
             return list(history)
         except Exception as e:
-            print(f"Error getting verification history: {e}")
+            logger.error("Error getting verification history: %s", e)
             return []
     
-    def update_file_verification_status(self, app_id, file_type, status, admin_notes=None):
-        """Update verification status for a specific file"""
+    @staticmethod
+    def _file_verification_history(app_id, old_status, updates):
+        """Build verification_history entries for file status updates that carry notes"""
+        now = datetime.utcnow()
+        return [
+            {
+                "application_id": ObjectId(app_id),
+                "admin_email": 'system',
+                "action": 'File Verification',
+                "field_name": f'{file_type}_status',
+                "old_value": old_status.get(file_type, 'Pending'),
+                "new_value": status,
+                "notes": admin_notes,
+                "created_at": now
+            }
+            for file_type, (status, admin_notes) in updates.items()
+            if admin_notes
+        ]
+
+    def update_verification_batch(self, app_id, admin_email, status, file_statuses,
+                                  verified_data=None, score_result=None, notes=None):
+        """Save a whole verification form (file statuses, overall status, score) in one write.
+
+        file_statuses maps file_type -> (status, admin_notes). verified_data and
+        score_result are stored when given; otherwise this is a status-only update
+        and a 'Status changed' history entry is recorded with notes.
+        """
         if self.db is None:
-            print("Database connection is None, cannot update file verification status")
-            return {}
+            logger.error("Database connection is None, cannot update verification")
+            return False
             
         try:
-            # Get current status
-            application = self.db.applications.find_one({"_id": ObjectId(app_id)})
-            if not application:
-                return {}
-                
-            current_status = application.get('file_verification_status', {})
-            
-            # Update the specific file status
-            old_status = current_status.get(file_type, 'Pending')
-            current_status[file_type] = status
+            now = datetime.utcnow()
+            set_doc = {
+                f"file_verification_status.{file_type}": file_status
+                for file_type, (file_status, _) in file_statuses.items()
+            }
+            set_doc.update({
+                "verification_status": status,
+                "verified_at": now,
+                "verified_by": admin_email
+            })
+            if score_result is not None:
+                set_doc["admin_verified_data"] = verified_data
+                set_doc["score_result"] = score_result
             
-            # Save back to database
-            self.db.applications.update_one(
+            # Previous file statuses come back from the same round trip for the history entries
+            previous = self.db.applications.find_one_and_update(
                 {"_id": ObjectId(app_id)},
-                {"$set": {"file_verification_status": current_status}}
+                {"$set": set_doc},
+                projection={"file_verification_status": 1},
+                return_document=ReturnDocument.BEFORE
             )
+            if not previous:
+                return False
+            self._application_cache.delete(str(app_id))
+            self._dashboard_stats_cache.clear()
             
-            # Add to history
-            if admin_notes:
-                self.add_verification_history(
-                    app_id, 
-                    'system', 
-                    'File Verification', 
-                    f'{file_type}_status',
-                    old_status,
-                    status,
-                    admin_notes
-                )
-            
-            return current_status
+            history = self._file_verification_history(
+                app_id, previous.get('file_verification_status') or {}, file_statuses
+            )
+            if score_result is None:
+                history.append({
+                    "application_id": ObjectId(app_id),
+                    "admin_email": admin_email,
+                    "action": f'Status changed to {status}',
+                    "field_name": None,
+                    "old_value": None,
+                    "new_value": None,
+                    "notes": notes,
+                    "created_at": now
+                })
+            if history:
+                self.db.verification_history.insert_many(history)
+            return True
         except Exception as e:
-            print(f"Error updating file verification status: {e}")
-            return {}
+            logger.error("Error updating verification: %s", e)
+            return False
     
-    def get_user_applications(self, user_id):
-        """Get all applications for a user"""
+    def get_user_applications(self, user_id, fields=None):
+        """Get all applications for a user (only the given fields, if any)"""
         if self.db is None:
-            print("Database connection is None, cannot get user applications")
+            logger.error("Database connection is None, cannot get user applications")
             return []
             
         try:
             applications = self.db.applications.find(
-                {"user_id": user_id}
+                {"user_id": user_id}, fields
             ).sort("created_at", DESCENDING)
-            return [Application.from_dict(app) for app in applications]
+            return Application.from_dicts(applications)
         except Exception as e:
-            print(f"Error getting user applications: {e}")
+            logger.error("Error getting user applications: %s", e)
             return []
+
+    def get_latest_scored_application(self, user_id):
+        """Get the user's most recent application that has a score"""
+        if self.db is None:
+            logger.error("Database connection is None, cannot get latest scored application")
+            return None
+
+        try:
+            application = self.db.applications.find_one(
+                {"user_id": user_id, "score_result.scaled_score": {"$gt": 0}},
+                sort=[("created_at", DESCENDING)]
+            )
+            return Application.from_dict(application) if application else None
+        except Exception as e:
+            logger.error("Error getting latest scored application: %s", e)
+            return None
     
     def get_application_by_id(self, app_id):
         """Get a specific application by ID"""
         if self.db is None:
-            print("Database connection is None, cannot get application by ID")
+            logger.error("Database connection is None, cannot get application by ID")
             return None
             
+        cached = self._application_cache.get(str(app_id))
+        if cached is not None:
+            return cached
+
         try:
             application = self.db.applications.find_one({"_id": ObjectId(app_id)})
-            return Application.from_dict(application) if application else None
+            if not application:
+                return None
+            application = Application.from_dict(application)
+            self._application_cache.set(str(app_id), application)
+            return application
         except Exception as e:
-            print(f"Error getting application by ID: {e}")
+            logger.error("Error getting application by ID: %s", e)
             return None
     
-    def get_all_applications(self, limit=100):
-        """Get all applications from all users"""
+    def get_application_files_path(self, app_id):
+        """Get only an application's files_path (None if the application doesn't exist)"""
+        if self.db is None:
+            logger.error("Database connection is None, cannot get application files")
+            return None
+
+        cached = self._application_cache.get(str(app_id))
+        if cached is not None:
+            return cached.files_path or {}
+
+        try:
+            application = self.db.applications.find_one({"_id": ObjectId(app_id)}, {"files_path": 1})
+            if not application:
+                return None
+            return application.get("files_path") or {}
+        except Exception as e:
+            logger.error("Error getting application files: %s", e)
+            return None
+
+    def get_all_applications(self, limit=100, fields=None):
+        """Get all applications from all users (only the given fields, if any)"""
         if self.db is None:
-            print("Database connection is None, cannot get all applications")
+            logger.error("Database connection is None, cannot get all applications")
             return []
             
         try:
-            applications = self.db.applications.find().sort("created_at", DESCENDING).limit(limit)
-            return [Application.from_dict(app) for app in applications]
+            applications = self.db.applications.find({}, fields).sort("created_at", DESCENDING).limit(limit)
+            return Application.from_dicts(applications)
         except Exception as e:
-            print(f"Error getting all applications: {e}")
+            logger.error("Error getting all applications: %s", e)
             return []
     
     def get_application_count(self):
         """Get total number of applications"""
         if self.db is None:
-            print("Database connection is None, cannot get application count")
+            logger.error("Database connection is None, cannot get application count")
             return 0
             
         try:
             return self.db.applications.count_documents({})
         except Exception as e:
-            print(f"Error getting application count: {e}")
+            logger.error("Error getting application count: %s", e)
             return 0
     
     def get_verification_stats(self):
         """Get verification statistics"""
         if self.db is None:
-            print("Database connection is None, cannot get verification stats")
+            logger.error("Database connection is None, cannot get verification stats")
             return {}
             
         try:
@@ -663,13 +1009,77 @@ class Database:
             results = list(self.db.applications.aggregate(pipeline))
             return {result["_id"]: result["count"] for result in results}
         except Exception as e:
-            print(f"Error getting verification stats: {e}")
+            logger.error("Error getting verification stats: %s", e)
             return {}
     
+    def get_dashboard_stats(self, recent_limit=10):
+        """Get application count, verification stats, average score, risk distribution and the most recent applications in one aggregation"""
+        stats = {
+            'applications': [],
+            'total_applications': 0,
+            'verification_stats': {},
+            'average_score': 0,
+            'risk_distribution': {'Low': 0, 'Medium': 0, 'High': 0, 'Very High': 0, 'Unknown': 0}
+        }
+        if self.db is None:
+            logger.error("Database connection is None, cannot get dashboard stats")
+            return stats
+        
+        cached = self._dashboard_stats_cache.get('stats')
+        if cached is not None:
+            return cached
+            
+        try:
+            pipeline = [
+                {"$facet": {
+                    "total": [{"$count": "count"}],
+                    "verification": [
+                        {"$group": {"_id": "$verification_status", "count": {"$sum": 1}}}
+                    ],
+                    "average": [
+                        {"$match": {"verification_status": "Verified"}},
+                        # $avg skips documents without a numeric scaled_score
+                        {"$group": {"_id": None, "avg_score": {"$avg": "$score_result.scaled_score"}}}
+                    ],
+                    "risk": [
+                        {"$match": {
+                            "verification_status": "Verified",
+                            "score_result.risk_level": {"$exists": True}
+                        }},
+                        {"$group": {"_id": "$score_result.risk_level", "count": {"$sum": 1}}}
+                    ],
+                    # $facet sub-pipelines can't use indexes, so this is a top-k sort
+                    # over the same collection pass the counts already make
+                    "recent": [
+                        {"$sort": {"created_at": DESCENDING}},
+                        {"$limit": recent_limit},
+                        # The dashboard table doesn't show form data or verification details
+                        {"$project": {"applicant_data": 0, "admin_verified_data": 0, "file_verification_status": 0}}
+                    ]
+                }}
+            ]
+            result = next(self.db.applications.aggregate(pipeline), None)
+            if not result:
+                return stats
+            
+            if result["total"]:
+                stats['total_applications'] = result["total"][0]["count"]
+            stats['verification_stats'] = {r["_id"]: r["count"] for r in result["verification"]}
+            if result["average"] and result["average"][0]["avg_score"] is not None:
+                stats['average_score'] = round(result["average"][0]["avg_score"], 2)
+            for r in result["risk"]:
+                stats['risk_distribution'][r["_id"]] = r["count"]
+            stats['applications'] = Application.from_dicts(result["recent"])
+            self._dashboard_stats_cache.set('stats', stats)
+            return stats
+        except Exception as e:
+            logger.error("Error getting dashboard stats: %s", e)
+            return stats
+    
     def get_average_score(self):
         """Get average TideScore across verified applications"""
         if self.db is None:
-            print("Database connection is None, cannot get average score")
+            logger.error("Database connection is None, cannot get average score")
             return 0
             
         try:
@@ -686,13 +1096,13 @@ class Database:
             result = list(self.db.applications.aggregate(pipeline))
             return round(result[0]["avg_score"], 2) if result else 0
         except Exception as e:
-            print(f"Error getting average score: {e}")
+            logger.error("Error getting average score: %s", e)
             return 0
     
     def get_risk_distribution(self):
         """Get count of applications by risk level"""
         if self.db is None:
-            print("Database connection is None, cannot get risk distribution")
+            logger.error("Database connection is None, cannot get risk distribution")
             return {'Low': 0, 'Medium': 0, 'High': 0, 'Very High': 0, 'Unknown': 0}
             
         try:
@@ -714,23 +1124,25 @@ class Database:
             
             return distribution
         except Exception as e:
-            print(f"Error getting risk distribution: {e}")
+            logger.error("Error getting risk distribution: %s", e)
             return {'Low': 0, 'Medium': 0, 'High': 0, 'Very High': 0, 'Unknown': 0}
     
     def update_application_score(self, app_id, score_result):
-        """Update application with score result"""
+        """Update application with score result; returns False if no such application"""
         if self.db is None:
-            print("Database connection is None, cannot update application score")
+            logger.error("Database connection is None, cannot update application score")
             return False
             
         try:
-            self.db.applications.update_one(
+            result = self.db.applications.update_one(
                 {"_id": ObjectId(app_id)},
                 {"$set": {"score_result": score_result}}
             )
-            return True
+            self._application_cache.delete(str(app_id))
+            self._dashboard_stats_cache.clear()
+            return result.matched_count > 0
         except Exception as e:
-            print(f"Error updating application score: {e}")
+            logger.error("Error updating application score: %s", e)
             return False
 
 # Create a global database instance
@@ -740,6 +1152,12 @@ db = Database()
 class Application:
     """Helper class to work with application data"""
     
+    __slots__ = (
+        'id', 'user_id', 'user_email', 'applicant_data', 'verification_status',
+        'admin_verified_data', 'score_result', 'created_at', 'verified_at',
+        'verified_by', 'files_path', 'file_verification_status'
+    )
+    
     def __init__(self):
         self.id = None
         self.user_id = None
@@ -781,7 +1199,8 @@ class Application:
         if not data:
             return None
         
-        app = Application()
+        # Every slot is assigned below, so skip __init__'s default values
+        app = Application.__new__(Application)
         app.id = str(data.get("_id", ""))
         app.user_id = data.get("user_id", "")
         app.user_email = data.get("user_email", "")
@@ -797,6 +1216,12 @@ class Application:
         
         return app
     
+    @staticmethod
+    def from_dicts(docs):
+        """Create application objects from an iterable of MongoDB documents"""
+        from_dict = Application.from_dict
+        return [from_dict(doc) for doc in docs]
+    
     def get_file_verification_status(self):
         """Get file verification status"""
         return self.file_verification_status
@@ -0,0 +1,208 @@
+import os
+import hashlib
+import queue
+import threading
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from config import Config
+from models import db
+
+logger = logging.getLogger(__name__)
+
+try:
+    from gevent.monkey import is_module_patched
+    from gevent.threadpool import ThreadPoolExecutor as NativeThreadPoolExecutor
+except ImportError:  # Not running under gevent workers
+    is_module_patched = None
+
+# === FILE STORAGE CONSTANTS ===
+MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB per file
+MAX_TOTAL_SIZE = 30 * 1024 * 1024  # 30MB total per user
+UPLOAD_DIR = os.path.abspath(Config.UPLOAD_DIR)  # Resolved once; send_file would otherwise resolve it against the app root
+UPLOAD_DIR_REAL = os.path.realpath(UPLOAD_DIR)  # Symlinks resolved, for path containment checks
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # Bytes copied per read when streaming uploads to disk
+UPLOAD_SPOOL_SIZE = MAX_FILE_SIZE  # Upload parts up to this size stay in memory while the form is parsed
+ALLOWED_UPLOAD_EXTS = frozenset({'pdf', 'png', 'jpg', 'jpeg', 'doc', 'docx'})
+UPLOAD_SAVE_WORKERS = 3  # One per document type in an application
+CLEANUP_MAX_WORKERS = 16  # Parallel unlinks when evicting files
+CLEANUP_DEBOUNCE_SECONDS = 1.0  # Coalesce cleanup requests arriving within this window
+CLEANUP_SWEEP_SECONDS = 300  # Interval between sweeps over all over-quota users
+UPLOADS_DIRFD = None  # Cached fd for the uploads directory (set by ensure_upload_directory)
+
+_BYTES_TO_MB = 1.0 / (1024 * 1024)
+
+# === UPLOAD DIRECTORY ===
+def ensure_upload_directory():
+    """Ensure the uploads directory exists and cache a directory fd for it"""
+    global UPLOADS_DIRFD
+    upload_dir = UPLOAD_DIR
+    try:
+        os.makedirs(upload_dir)
+        logger.info("Created upload directory: %s", upload_dir)
+    except FileExistsError:
+        pass
+    # dir_fd is unavailable on Windows; _safe_unlink falls back to path-based removal there
+    if UPLOADS_DIRFD is None and os.unlink in os.supports_dir_fd:
+        UPLOADS_DIRFD = os.open(upload_dir, os.O_DIRECTORY | os.O_RDONLY)
+    return upload_dir
+
+def resolve_upload_path(filename):
+    """Absolute path of an uploaded file, or None if it would resolve outside the uploads directory"""
+    target = os.path.realpath(os.path.join(UPLOAD_DIR_REAL, filename))
+    if os.path.commonpath([target, UPLOAD_DIR_REAL]) != UPLOAD_DIR_REAL:
+        return None
+    return target
+
+def decorate_storage(storage_info):
+    """Add the MB and percentage display fields to a storage_info dict"""
+    used = storage_info['used']
+    limit = storage_info['limit']
+    storage_info['used_mb'] = round(used * _BYTES_TO_MB, 2)
+    storage_info['limit_mb'] = round(limit * _BYTES_TO_MB, 2)
+    storage_info['available_mb'] = round(storage_info['available'] * _BYTES_TO_MB, 2)
+    storage_info['usage_percent'] = round(used * 100.0 / limit, 2) if limit > 0 else 0
+    return storage_info
+
+def disk_executor(max_workers, thread_name_prefix):
+    """Thread pool for blocking disk I/O that runs on real OS threads.
+
+    Under gevent workers a plain ThreadPoolExecutor's threads are greenlets, so
+    its reads, writes and unlinks would run one at a time on the event loop and
+    stall every other request in the worker.
+    """
+    if is_module_patched is not None and is_module_patched('threading'):
+        return NativeThreadPoolExecutor(max_workers)
+    return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=thread_name_prefix)
+
+# === UPLOAD STREAMING ===
+_UPLOAD_EXECUTOR = disk_executor(UPLOAD_SAVE_WORKERS, 'upload-save')
+
+def stream_upload(file, file_path, max_size):
+    """Copy an uploaded file to file_path in chunks, hashing it on the way.
+
+    Returns (bytes written, SHA-256 hex digest), or None (leaving no file
+    behind) if the upload is larger than max_size.
+    """
+    size = 0
+    digest = hashlib.sha256()
+    try:
+        with open(file_path, 'wb') as out:
+            while True:
+                chunk = file.stream.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_size:
+                    break
+                digest.update(chunk)
+                out.write(chunk)
+    finally:
+        # Release the spooled buffer now rather than at the end of the request
+        file.close()
+
+    if size > max_size:
+        os.remove(file_path)
+        return None
+    return size, digest.hexdigest()
+
+def save_upload_async(file, file_path, max_size=MAX_FILE_SIZE):
+    """Start stream_upload() on the upload pool and return its Future"""
+    return _UPLOAD_EXECUTOR.submit(stream_upload, file, file_path, max_size)
+
+# === STORAGE CLEANUP ===
+def _safe_unlink(filename):
+    """Remove an uploaded file, ignoring files that are already gone"""
+    try:
+        if UPLOADS_DIRFD is not None:
+            # unlinkat() against the cached directory skips a full path lookup per file
+            os.unlink(filename, dir_fd=UPLOADS_DIRFD)
+        else:
+            os.remove(os.path.join(UPLOAD_DIR, filename))
+        logger.debug("Cleaned up file: %s", filename)
+    except FileNotFoundError:
+        pass
+
+_CLEANUP_QUEUE = queue.Queue()
+_cleanup_worker = None
+_cleanup_worker_lock = threading.Lock()
+
+def cleanup_user_files(user_id):
+    """Queue a storage cleanup for a user; the work runs on a background thread"""
+    ensure_cleanup_worker()
+    _CLEANUP_QUEUE.put(user_id)
+    return True
+
+def ensure_cleanup_worker():
+    """Start the cleanup worker thread on first use (after any server fork).
+
+    Under gevent this is a greenlet; it only waits on the queue and MongoDB,
+    which yield to the loop, and hands its unlinks to disk_executor().
+    """
+    global _cleanup_worker
+    with _cleanup_worker_lock:
+        if _cleanup_worker is None or not _cleanup_worker.is_alive():
+            _cleanup_worker = threading.Thread(target=_cleanup_worker_loop, name='storage-cleanup', daemon=True)
+            _cleanup_worker.start()
+
+def _cleanup_worker_loop():
+    """Drain queued cleanups, running each user at most once per debounce window.
+
+    Every CLEANUP_SWEEP_SECONDS, busy or not, also sweep every over-quota user
+    so cleanups that failed earlier are retried.
+    """
+    next_sweep = time.monotonic() + CLEANUP_SWEEP_SECONDS
+    while True:
+        try:
+            pending = {_CLEANUP_QUEUE.get(timeout=max(0, next_sweep - time.monotonic()))}
+        except queue.Empty:
+            pending = None
+        if pending:
+            deadline = time.monotonic() + CLEANUP_DEBOUNCE_SECONDS
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    pending.add(_CLEANUP_QUEUE.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            _cleanup_users_now(pending)
+        if time.monotonic() >= next_sweep:
+            _cleanup_users_now(None)
+            next_sweep = time.monotonic() + CLEANUP_SWEEP_SECONDS
+
+def _cleanup_users_now(user_ids):
+    """Delete the oldest files of every listed user (or any user, if None) over the storage limit"""
+    try:
+        # Most cleanups find the user under quota; check the whole batch in one query
+        over_quota = db.get_over_quota_user_ids(user_ids, MAX_TOTAL_SIZE)
+
+        # Oldest files to delete until under limit, computed server-side
+        evictions = {}
+        for user_id in over_quota:
+            victims = db.compute_eviction_set(user_id, MAX_TOTAL_SIZE)
+            if victims:
+                evictions[user_id] = (
+                    [victim['filename'] for victim in victims],
+                    sum(victim['size'] for victim in victims)
+                )
+
+        if not evictions:
+            return True
+
+        # Update the DB first (one bulk write for all users) so a failed write
+        # doesn't leave rows pointing at deleted files
+        cleaned = db.remove_user_files_bulk(evictions)
+        to_delete_names = [filename for user_id in cleaned for filename in evictions[user_id][0]]
+
+        # Delete physical files in parallel; each unlink blocks on filesystem metadata
+        if to_delete_names:
+            with disk_executor(min(CLEANUP_MAX_WORKERS, len(to_delete_names)), 'storage-unlink') as executor:
+                list(executor.map(_safe_unlink, to_delete_names))
+
+        return len(cleaned) == len(evictions)
+
+    except Exception as e:
+        logger.error("Error cleaning up user files for %s: %s", user_ids if user_ids is not None else 'all users', e)
+        return False